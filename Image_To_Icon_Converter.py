@@ -1,7 +1,21 @@
+import io
+import json
+import math
+import mmap
+import multiprocessing
 import os
+import socket
 import sys
 import sqlite3
-from PIL import Image, ImageOps
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import resource_tracker, shared_memory
+from PIL import Image, ImageOps, IcoImagePlugin
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QPushButton, QFileDialog, QComboBox, QCheckBox,
                              QListWidget, QProgressBar, QMessageBox, QGroupBox, QSizePolicy,
@@ -69,109 +83,741 @@ class MacaronColors:
     # 中性色
     CARAMEL_CREAM = QColor(240, 230, 221) # 焦糖奶霜
 
+class IcoFrame(namedtuple('IcoFrame', 'width height colors planes bpp data')):
+    """ICO文件中未解码的单帧(PNG或BMP数据)，可原样复制到新的ICO文件"""
+    __slots__ = ()
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+
 class ImageToIconConverter:
+    # 多分辨率图标的文件头
+    ICO_MAGIC = b'\x00\x00\x01\x00'
+    ICNS_MAGIC = b'icns'
+
     @staticmethod
     def convert_to_ico(image_path, output_path, sizes, preserve_aspect=True, add_transparency=False):
         # print(f"正在转换: {image_path} 到 {output_path}")
         """将图片转换为ICO格式
         
         Args:
-            image_path: 输入图片路径
-            output_path: 输出ICO路径
+            image_path: 输入图片路径或可读的文件对象(如压缩包成员)
+            output_path: 输出ICO路径或可写的文件对象
             sizes: 要包含的尺寸列表，如 [16, 32, 48]
             preserve_aspect: 是否保持宽高比
             add_transparency: 是否添加透明通道
         """
         try:
-            # 打开图像并转换为RGBA模式(确保有透明通道)
-            img = Image.open(image_path)
-            if img.mode != 'RGBA':
-                if add_transparency or img.format.lower() in ['jpeg', 'jpg']:
-                    img = img.convert('RGBA')
-                else:
-                    img = img.convert('RGB')
-            
-            # 创建不同尺寸的图像
-            ico_images = []
-            # print(f"[DEBUG] 原始图像尺寸: {img.size}")
-            for size in sizes:
-                # print(f"[DEBUG] 处理尺寸: {size}")
-                # 保持宽高比的缩放
-                if preserve_aspect:
-                    # print(f"[DEBUG] 保持宽高比: {preserve_aspect}")
-                    # 计算新的尺寸，保持比例
-                    ratio = min(size/img.width, size/img.height)
-                    new_size = (int(img.width * ratio), int(img.height * ratio))
-                    resized_img = img.resize(new_size, Image.LANCZOS)
-                    
-                    # 创建正方形画布，透明背景
-                    canvas = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-                    # 将图像居中粘贴到画布上
-                    offset = ((size - new_size[0]) // 2, (size - new_size[1]) // 2)
-                    canvas.paste(resized_img, offset)
-                    ico_images.append(canvas)
-                else:
-                    # 直接缩放为正方形
-                    resized_img = img.resize((size, size), Image.LANCZOS)
-                    ico_images.append(resized_img)
-            
-            # 保存为ICO文件 - 修改后的代码
-            # print(f"[DEBUG] 准备保存ICO文件，尺寸: {sizes}")
-            
-            # 确保第一个图像是最小尺寸（ICO格式要求）
-            ico_images.sort(key=lambda x: x.size[0])
-            # print(f"[DEBUG] 排序后的尺寸: {[img.size for img in ico_images]}")
-            
-            # 创建临时文件保存第一个图像
-            first_img = ico_images[0]
-            first_img.save(output_path, format='ICO', quality=100)
-            # print(f"[DEBUG] ICO文件保存成功: {output_path}")
-            
-            # 如果有多个尺寸，追加其他图像
-            if len(ico_images) > 1:
+            # 多分辨率图标：按目标尺寸挑选内嵌帧，而不是从默认帧缩放
+            ico_images = ImageToIconConverter.retarget_frames(image_path, sizes, preserve_aspect, add_transparency)
+            if ico_images is None:
+                img = ImageToIconConverter.load_image(image_path, add_transparency)
+                ico_images = ImageToIconConverter.resize_frames(img, sizes, preserve_aspect)
+            return ImageToIconConverter.encode_ico(ico_images, output_path, sizes)
                 
-                with Image.open(output_path) as existing_ico:
-                    
-                    # 保存所有图像到ICO
-                    existing_ico.save(
-                        output_path,
-                        format='ICO',
-                        append_images=ico_images[1:],
-                        quality=100
-
-                    )
+        except Exception as e:
+            print(f"转换错误: {str(e)}")
+            return False
+
+    @staticmethod
+    def target_mode(img, add_transparency=False):
+        """解码后使用的图像模式(RGBA或RGB)"""
+        if img.mode == 'RGBA' or add_transparency or (img.format or '').lower() in ['jpeg', 'jpg']:
+            return 'RGBA'
+        return 'RGB'
+
+    @staticmethod
+    def load_image(image_path, add_transparency=False):
+        """解码阶段：打开图像并转换为RGBA/RGB模式"""
+        # 打开图像并转换为RGBA模式(确保有透明通道)
+        return ImageToIconConverter.prepare_image(Image.open(image_path), add_transparency)
+
+    @staticmethod
+    def prepare_image(img, add_transparency=False):
+        """把已打开的图像转换为RGBA/RGB模式"""
+        if img.mode != 'RGBA':
+            img = img.convert(ImageToIconConverter.target_mode(img, add_transparency))
+        return img
+
+    @staticmethod
+    def read_ico_entries(fp):
+        """读取ICO目录及各帧原始数据，返回 IcoFrame 列表(宽高取自目录)，不解码像素"""
+        fp.seek(0)
+        _, _, count = struct.unpack('<HHH', fp.read(6))
+        entries = [struct.unpack('<BBBBHHII', fp.read(16)) for _ in range(count)]
+        frames = []
+        for width, height, colors, _, planes, bpp, data_size, offset in entries:
+            fp.seek(offset)
+            # 宽高为0表示256
+            frames.append(IcoFrame(width or 256, height or 256, colors, planes, bpp, fp.read(data_size)))
+        return frames
+
+    @staticmethod
+    def ico_frame_dimensions(data):
+        """从帧数据头部读取实际宽高(PNG读IHDR，BMP读信息头)，无法识别时返回 None"""
+        if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+            return struct.unpack('>II', data[16:24])
+        if len(data) >= 12:
+            header_size, width, height = struct.unpack('<Iii', data[:12])
+            if header_size >= 40:
+                # ICO中BMP的高度包含AND掩码，是图像高度的两倍
+                return (width, abs(height) // 2)
+        return None
+
+    @staticmethod
+    def read_ico_frames(fp):
+        """返回可原样复制的帧 {(宽, 高): IcoFrame}，同尺寸多帧时保留色深最高的一帧
+        
+        目录中的尺寸与帧数据的实际尺寸不符时(例如大于256的PNG帧在目录中记为0，
+        即按256处理)，该帧不能原样复制，不会出现在结果中。
+        """
+        frames = {}
+        for frame in ImageToIconConverter.read_ico_entries(fp):
+            if frame.size in frames and frames[frame.size].bpp >= frame.bpp:
+                continue
+            if tuple(ImageToIconConverter.ico_frame_dimensions(frame.data) or ()) != frame.size:
+                continue
+            frames[frame.size] = frame
+        return frames
+
+    @staticmethod
+    def retarget_frames(image_path, sizes, preserve_aspect=True, add_transparency=False):
+        """从多分辨率图标(ICO/ICNS)生成各目标尺寸的帧，其他格式返回 None
+        
+        - ICO中已有完全相同尺寸的帧：原样复制，不解码也不重新编码
+        - 否则只解码不小于目标尺寸的最小帧(没有则用最大帧)，再缩放到目标尺寸
+        """
+        if hasattr(image_path, 'read'):
+            return ImageToIconConverter._retarget_from_fp(image_path, sizes, preserve_aspect, add_transparency)
+        with open(image_path, 'rb') as fp:
+            return ImageToIconConverter._retarget_from_fp(fp, sizes, preserve_aspect, add_transparency)
+
+    @staticmethod
+    def _retarget_from_fp(fp, sizes, preserve_aspect, add_transparency):
+        magic = fp.read(4)
+        fp.seek(0)
+        if magic == ImageToIconConverter.ICO_MAGIC:
+            # 直接读取ICO目录(Image.open 会立即解码最大的一帧)
+            raw_frames = ImageToIconConverter.read_ico_frames(fp)
+            fp.seek(0)
+            ico = IcoImagePlugin.IcoFile(fp)
+            # 帧的实际像素尺寸 -> 用于选择该帧的键
+            available = {size: size for size in ico.sizes()}
+            decode_frame = ico.getimage
+        elif magic == ImageToIconConverter.ICNS_MAGIC:
+            raw_frames = {}
+            icns = Image.open(fp).icns
+            # ICNS 的尺寸为 (宽, 高, 缩放倍数)
+            available = {(w * scale, h * scale): (w, h, scale) for w, h, scale in icns.itersizes()}
+            decode_frame = icns.getimage
+        else:
+            return None
+        
+        by_area = sorted(available, key=lambda size: size[0] * size[1])
+        decoded = {}
+        ico_images = []
+        for size in sizes:
+            if (size, size) in raw_frames:
+                ico_images.append(raw_frames[(size, size)])
+                continue
             
-            # print(f"[DEBUG] ICO文件保存成功: {output_path}")
+            larger = [frame_size for frame_size in by_area if frame_size[0] >= size and frame_size[1] >= size]
+            frame_size = larger[0] if larger else by_area[-1]
+            if frame_size not in decoded:
+                frame_img = decode_frame(available[frame_size])
+                frame_img.load()
+                decoded[frame_size] = ImageToIconConverter.prepare_image(frame_img, add_transparency)
+            frame_img = decoded[frame_size]
             
-            # 验证生成的ICO文件
-            try:
-                with Image.open(output_path) as test_img:
-                    # print(f"[DEBUG] 验证ICO文件: {output_path}")
-                    if test_img.format != 'ICO':
-                        raise ValueError("生成的不是有效的ICO文件")
-                    # 检查是否包含所有尺寸
-                    if hasattr(test_img, 'n_frames'):
-                        # print(f"[DEBUG] ICO文件包含 {test_img.n_frames} 帧")
-                        actual_sizes = set()
-                        
-                        for i in range(test_img.n_frames):
-                            # print(f"[DEBUG] 读取帧 {i}")
-                            test_img.seek(i)
-                            actual_sizes.add(test_img.size[0])
-                            # print(f"[DEBUG] 帧 {i} 尺寸: {test_img.size}")
-                        if actual_sizes != set(sizes):
-                            # 1
-                            # print(f"[DEBUG] 实际尺寸: {sorted(actual_sizes)}")
-                            raise ValueError(f"ICO文件尺寸不匹配，期望: {sizes}, 实际: {sorted(actual_sizes)}")
-                return True
-            except Exception as e:
-                os.remove(output_path)
-                return False
+            if frame_img.size == (size, size):
+                ico_images.append(frame_img)
+            else:
+                ico_images.extend(ImageToIconConverter.resize_frames(frame_img, [size], preserve_aspect))
+        
+        # 文件对象交还调用方时恢复到开头
+        fp.seek(0)
+        return ico_images
+
+    @staticmethod
+    def build_ico(frames):
+        """把图像和未解码的ICO帧组装为ICO文件数据，图像帧以PNG格式编码"""
+        ico_frames = []
+        for frame in frames:
+            if isinstance(frame, IcoFrame):
+                ico_frames.append(frame)
+                continue
+            png_buffer = io.BytesIO()
+            frame.save(png_buffer, format='PNG')
+            bpp = 32 if frame.mode == 'RGBA' else 24
+            ico_frames.append(IcoFrame(frame.width, frame.height, 0, 1, bpp, png_buffer.getvalue()))
+        
+        ico_frames.sort(key=lambda x: x.size[0])
+        header = struct.pack('<HHH', 0, 1, len(ico_frames))
+        directory = b''
+        offset = len(header) + 16 * len(ico_frames)
+        for frame in ico_frames:
+            # 256 在目录中记为 0
+            directory += struct.pack(
+                '<BBBBHHII', frame.width % 256, frame.height % 256, frame.colors, 0,
+                frame.planes, frame.bpp, len(frame.data), offset
+            )
+            offset += len(frame.data)
+        return header + directory + b''.join(frame.data for frame in ico_frames)
+
+    @staticmethod
+    def resize_frames(img, sizes, preserve_aspect=True):
+        """缩放阶段：生成每个目标尺寸的图像"""
+        # 创建不同尺寸的图像
+        ico_images = []
+        # print(f"[DEBUG] 原始图像尺寸: {img.size}")
+        for size in sizes:
+            # print(f"[DEBUG] 处理尺寸: {size}")
+            # 保持宽高比的缩放
+            if preserve_aspect:
+                # print(f"[DEBUG] 保持宽高比: {preserve_aspect}")
+                # 计算新的尺寸，保持比例
+                ratio = min(size/img.width, size/img.height)
+                new_size = (int(img.width * ratio), int(img.height * ratio))
+                resized_img = img.resize(new_size, Image.LANCZOS)
                 
+                # 创建正方形画布，透明背景
+                canvas = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+                # 将图像居中粘贴到画布上
+                offset = ((size - new_size[0]) // 2, (size - new_size[1]) // 2)
+                canvas.paste(resized_img, offset)
+                ico_images.append(canvas)
+            else:
+                # 直接缩放为正方形
+                resized_img = img.resize((size, size), Image.LANCZOS)
+                ico_images.append(resized_img)
+        return ico_images
+
+    @staticmethod
+    def encode_ico(ico_images, output_path, sizes):
+        """编码阶段：编码为ICO并验证，成功后写入输出，返回是否成功"""
+        # 保存为ICO文件 - 先编码到内存缓冲区，验证通过后再写入目标
+        # print(f"[DEBUG] 准备保存ICO文件，尺寸: {sizes}")
+        
+        # 以最大尺寸作为基础图像，其余尺寸通过 append_images 提供
+        # (Pillow 会跳过比基础图像更大的尺寸)
+        ico_images = sorted(ico_images, key=lambda x: x.size[0], reverse=True)
+        # print(f"[DEBUG] 排序后的尺寸: {[img.size for img in ico_images]}")
+        
+        if any(isinstance(img, IcoFrame) for img in ico_images):
+            # 含有从源ICO原样复制的帧，自行组装ICO
+            ico_buffer = io.BytesIO(ImageToIconConverter.build_ico(ico_images))
+        else:
+            ico_buffer = io.BytesIO()
+            ico_images[0].save(
+                ico_buffer,
+                format='ICO',
+                sizes=[img.size for img in ico_images],
+                append_images=ico_images[1:],
+                quality=100
+            )
+        
+        # 验证生成的ICO数据
+        try:
+            ico_buffer.seek(0)
+            with Image.open(ico_buffer) as test_img:
+                # print(f"[DEBUG] 验证ICO数据")
+                if test_img.format != 'ICO':
+                    raise ValueError("生成的不是有效的ICO文件")
+                # 检查是否包含所有尺寸
+                if hasattr(test_img, 'n_frames'):
+                    # print(f"[DEBUG] ICO文件包含 {test_img.n_frames} 帧")
+                    actual_sizes = set()
+                    
+                    for i in range(test_img.n_frames):
+                        # print(f"[DEBUG] 读取帧 {i}")
+                        test_img.seek(i)
+                        actual_sizes.add(test_img.size[0])
+                        # print(f"[DEBUG] 帧 {i} 尺寸: {test_img.size}")
+                    if actual_sizes != set(sizes):
+                        # 1
+                        # print(f"[DEBUG] 实际尺寸: {sorted(actual_sizes)}")
+                        raise ValueError(f"ICO文件尺寸不匹配，期望: {sizes}, 实际: {sorted(actual_sizes)}")
+                else:
+                    # IcoImageFile 没有 n_frames，直接核对各帧数据中的实际尺寸
+                    actual_sizes = set()
+                    for frame in ImageToIconConverter.read_ico_entries(ico_buffer):
+                        if tuple(ImageToIconConverter.ico_frame_dimensions(frame.data) or ()) != frame.size:
+                            raise ValueError(f"ICO帧的实际尺寸与目录不符: {frame.size}")
+                        actual_sizes.add(frame.width)
+                    if actual_sizes != set(sizes):
+                        raise ValueError(f"ICO文件尺寸不匹配，期望: {sizes}, 实际: {sorted(actual_sizes)}")
         except Exception as e:
-            print(f"转换错误: {str(e)}")
             return False
+        
+        # 写入输出(文件路径或可写的文件对象，如压缩包成员缓冲区)
+        if hasattr(output_path, 'write'):
+            output_path.write(ico_buffer.getvalue())
+        else:
+            # 先写入同目录下的临时文件再原子替换，其他进程不会读到写了一半的文件
+            # (临时文件名按进程和线程区分；用 open 创建以沿用默认的文件权限)
+            temp_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(temp_path, 'wb') as f:
+                    f.write(ico_buffer.getvalue())
+                os.replace(temp_path, output_path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        # print(f"[DEBUG] ICO文件保存成功: {output_path}")
+        return True
+
+
+class SharedFrame:
+    """存放在共享内存中的图像帧，用于进程间零拷贝传递像素数据
+    
+    跨进程只传递描述符 (共享内存名, 模式, 尺寸)，像素数据留在共享内存段中。
+    生命周期约定：
+    - 共享内存段由协调进程通过 allocate() 分配，协调进程是唯一所有者，
+      所有者 close() 时删除(unlink)该段
+    - 工作进程通过 attach() 连接，只读写像素，close() 时仅断开连接
+    - image() 返回的图像可能直接引用共享内存，应在 close() 之前释放
+    """
+    # Image.frombuffer 可以直接映射(不复制)的模式
+    MAPPED_MODES = ('L', 'P', 'RGBX', 'RGBA', 'RGBa', 'CMYK', 'I;16', 'I;16L', 'I;16B')
+
+    def __init__(self, shm, mode, size, owner):
+        self.shm = shm
+        self.mode = mode
+        self.size = tuple(size)
+        self.owner = owner
+
+    @classmethod
+    def allocate(cls, mode, size):
+        """分配一个空白帧，返回拥有该共享内存段的 SharedFrame"""
+        nbytes = cls.frame_nbytes(mode, size)
+        shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        return cls(shm, mode, size, owner=True)
+
+    @classmethod
+    def attach(cls, descriptor):
+        """根据描述符连接到已有的共享内存段(不获得所有权)"""
+        name, mode, size = descriptor
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # 旧版本连接时也会登记到 resource_tracker，工作进程退出时会误删该段，
+            # 因此连接期间跳过登记，由所有者负责删除
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, mode, size, owner=False)
+
+    @staticmethod
+    def frame_nbytes(mode, size):
+        """指定模式和尺寸的像素数据字节数"""
+        return len(Image.new(mode, (1, 1)).tobytes()) * size[0] * size[1]
+
+    @property
+    def descriptor(self):
+        """可pickle的轻量描述符"""
+        return (self.shm.name, self.mode, self.size)
+
+    def image(self):
+        """返回引用共享内存的图像(不支持直接映射的模式会复制一份)"""
+        # 共享内存段可能按页对齐而大于像素数据，只取实际长度的视图
+        data = self.shm.buf[:self.frame_nbytes(self.mode, self.size)]
+        if self.mode in self.MAPPED_MODES:
+            return Image.frombuffer(self.mode, self.size, data, 'raw', self.mode, 0, 1)
+        return Image.frombytes(self.mode, self.size, data)
+
+    def write(self, img):
+        """把图像像素写入共享内存段"""
+        if img.mode != self.mode or img.size != self.size:
+            raise ValueError(f"帧格式不匹配，期望: {self.mode} {self.size}, 实际: {img.mode} {img.size}")
+        data = img.tobytes()
+        self.shm.buf[:len(data)] = data
+
+    def close(self):
+        """断开连接；所有者同时删除共享内存段"""
+        try:
+            self.shm.close()
+        except BufferError:
+            # 仍有图像引用该内存，映射随这些对象释放；段本身照常删除
+            pass
+        if self.owner:
+            self.owner = False
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def convert_frames_into_shared(image_path, sizes, preserve_aspect, add_transparency, descriptors):
+    """进程池任务：解码并缩放图像，把各尺寸的帧写入协调进程分配的RGBA共享内存帧
+    
+    返回与 sizes 对应的列表：像素帧为其缩放后的原始模式，协调进程据此还原
+    (RGB帧写入时临时补上不透明通道)；从多分辨率图标原样复制的帧直接返回 IcoFrame
+    (已编码的数据，不是像素)。
+    """
+    source = ArchiveIO.open_source(image_path)
+    # 与 convert_to_ico 相同：多分辨率图标按目标尺寸挑选内嵌帧
+    ico_images = ImageToIconConverter.retarget_frames(source, sizes, preserve_aspect, add_transparency)
+    if ico_images is None:
+        img = ImageToIconConverter.load_image(source, add_transparency)
+        ico_images = ImageToIconConverter.resize_frames(img, sizes, preserve_aspect)
+    results = []
+    for descriptor, ico_image in zip(descriptors, ico_images):
+        if isinstance(ico_image, IcoFrame):
+            results.append(ico_image)
+            continue
+        with SharedFrame.attach(descriptor) as frame:
+            frame.write(ico_image if ico_image.mode == 'RGBA' else ico_image.convert('RGBA'))
+        results.append(ico_image.mode)
+    return results
+
+
+class ArchiveIO:
+    """压缩包(zip/tar)路径工具
+    
+    压缩包内的成员使用 "压缩包路径!/成员名" 形式的虚拟路径表示，
+    例如 "D:/drops/icons.zip!/png/app.png"。
+    """
+    MEMBER_SEP = '!/'
+    IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.ico', '.icns')
+    ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+    ARCHIVE_FILTER = "压缩包 (*.zip *.tar *.tar.gz *.tgz *.tar.bz2 *.tbz2 *.tar.xz *.txz)"
+
+    @classmethod
+    def is_archive(cls, path):
+        """判断路径是否为支持的压缩包"""
+        return isinstance(path, str) and path.lower().endswith(cls.ARCHIVE_EXTENSIONS)
+
+    @classmethod
+    def split_member_path(cls, path):
+        """拆分虚拟路径，返回 (压缩包路径, 成员名)；普通路径返回 (路径, None)"""
+        lower = path.lower()
+        for ext in cls.ARCHIVE_EXTENSIONS:
+            index = lower.find(ext + cls.MEMBER_SEP)
+            if index != -1:
+                split_at = index + len(ext)
+                return path[:split_at], path[split_at + len(cls.MEMBER_SEP):]
+        return path, None
+
+    @classmethod
+    def join_member_path(cls, archive_path, member_name):
+        """组合压缩包路径和成员名为虚拟路径"""
+        return f"{archive_path}{cls.MEMBER_SEP}{member_name}"
+
+    @classmethod
+    def output_member_names(cls, input_paths):
+        """为批量输出到压缩包的每个输入生成成员名(扩展名改为.ico)
+        
+        压缩包成员保留其在源压缩包中的相对路径，普通文件保留相对于共同上级目录的路径；
+        仍然重名时追加 " (2)"、" (3)" 等后缀，保证输出压缩包中没有重复成员。
+        """
+        plain_dirs = [os.path.dirname(os.path.abspath(path)) for path in input_paths
+                      if cls.split_member_path(path)[1] is None]
+        try:
+            common_dir = os.path.commonpath(plain_dirs) if plain_dirs else None
+        except ValueError:
+            # 不同驱动器上的文件没有共同上级目录
+            common_dir = None
+        
+        names = []
+        used = set()
+        for path in input_paths:
+            archive_path, member_name = cls.split_member_path(path)
+            if member_name is not None:
+                relative = member_name
+            elif common_dir is not None:
+                relative = os.path.relpath(os.path.abspath(path), common_dir)
+            else:
+                relative = os.path.basename(path)
+            # 统一使用 / 分隔，并去掉空、"." 和 ".." 路径段
+            parts = relative.replace(os.sep, '/').split('/')
+            relative = '/'.join(part for part in parts if part not in ('', '.', '..'))
+            
+            stem = os.path.splitext(relative)[0]
+            name = stem + '.ico'
+            index = 2
+            # 按不区分大小写比较，避免在Windows上解压时互相覆盖
+            while name.lower() in used:
+                name = f"{stem} ({index}).ico"
+                index += 1
+            used.add(name.lower())
+            names.append(name)
+        return names
+
+    @classmethod
+    def batch_output_paths(cls, output, input_paths):
+        """批量转换时各输入的输出路径，成员名同 output_member_names
+        
+        输出到压缩包时为 "压缩包路径!/成员名" 虚拟路径，否则为输出文件夹下的文件路径。
+        """
+        names = cls.output_member_names(input_paths)
+        if cls.is_archive(output):
+            return [cls.join_member_path(output, name) for name in names]
+        return [os.path.join(output, *name.split('/')) for name in names]
+
+    @classmethod
+    def list_image_members(cls, archive_path):
+        """列出压缩包中所有图片成员的虚拟路径
+        
+        zip 只读取中央目录；tar 没有目录，列出成员需要读完整个归档，
+        .tar.gz/.tar.bz2/.tar.xz 还要解压整个数据流。建立的成员索引随打开的
+        压缩包一起缓存，之后 open_source() 读取成员时直接复用，不会再次扫描。
+        """
+        with cls._reader_lock:
+            reader = cls._cached_reader(archive_path)
+            return [cls.join_member_path(archive_path, name) for name in reader.image_names()]
+
+    @classmethod
+    def open_source(cls, path, readers=None):
+        """返回可供 Image.open 使用的输入源
+        
+        普通路径原样返回；压缩包成员按需读入内存缓冲区。
+        readers 为 {压缩包路径: ArchiveReader} 缓存，批量处理时复用已打开的压缩包，
+        由调用方负责关闭；为 None 时使用进程内共享的缓存(见 close_cached_readers)。
+        
+        注意：压缩的tar包只能顺序解压，按成员顺序读取时只需解压一遍，
+        向前跳回读取较早的成员则要从头重新解压。
+        """
+        archive_path, member_name = cls.split_member_path(path)
+        if member_name is None:
+            return path
+        if readers is None:
+            with cls._reader_lock:
+                return io.BytesIO(cls._cached_reader(archive_path).read(member_name))
+        if archive_path not in readers:
+            readers[archive_path] = ArchiveReader(archive_path)
+        return io.BytesIO(readers[archive_path].read(member_name))
+
+    # 预览、任务队列等逐个访问成员的场景共享已打开的压缩包及其成员索引
+    _reader_cache = {}
+    _reader_lock = threading.Lock()
+    MAX_CACHED_READERS = 4
+
+    @classmethod
+    def _cached_reader(cls, archive_path):
+        """返回缓存的 ArchiveReader，文件被修改后重新打开；调用方须持有 _reader_lock"""
+        stat = os.stat(archive_path)
+        key = os.path.abspath(archive_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = cls._reader_cache.pop(key, None)
+        if cached is not None and cached[0] != signature:
+            cached[1].close()
+            cached = None
+        if cached is None:
+            cached = (signature, ArchiveReader(archive_path))
+        # 重新插入到末尾，按最近使用顺序淘汰最早的压缩包
+        cls._reader_cache[key] = cached
+        while len(cls._reader_cache) > cls.MAX_CACHED_READERS:
+            oldest = next(iter(cls._reader_cache))
+            cls._reader_cache.pop(oldest)[1].close()
+        return cached[1]
+
+    @classmethod
+    def close_cached_readers(cls):
+        """关闭所有缓存的压缩包"""
+        with cls._reader_lock:
+            for _, reader in cls._reader_cache.values():
+                reader.close()
+            cls._reader_cache.clear()
+
+
+class ArchiveReader:
+    """只读打开 zip/tar 压缩包，按需读取单个成员到内存"""
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        if zipfile.is_zipfile(archive_path):
+            self.zip = zipfile.ZipFile(archive_path, 'r')
+            self.tar = None
+        else:
+            self.zip = None
+            self.tar = tarfile.open(archive_path, 'r:*')
+        self.tar_members = None
+
+    def image_names(self):
+        """按压缩包内顺序返回图片成员名"""
+        if self.zip is not None:
+            names = [info.filename for info in self.zip.infolist() if not info.is_dir()]
+        else:
+            names = list(self._tar_index())
+        return [name for name in names if name.lower().endswith(ArchiveIO.IMAGE_EXTENSIONS)]
+
+    def _tar_index(self):
+        """{成员名: TarInfo}，首次调用时扫描整个tar包"""
+        if self.tar_members is None:
+            self.tar_members = {info.name: info for info in self.tar.getmembers() if info.isfile()}
+        return self.tar_members
+
+    def read(self, member_name):
+        """读取成员的全部数据"""
+        if self.zip is not None:
+            return self.zip.read(member_name)
+        member_info = self._tar_index().get(member_name)
+        if member_info is None:
+            raise KeyError(f"压缩包中没有成员: {member_name}")
+        with self.tar.extractfile(member_info) as member_file:
+            return member_file.read()
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+        else:
+            self.tar.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ArchiveWriter:
+    """以流式方式向 zip/tar 压缩包追加成员，数据直接写入压缩包"""
+    TAR_MODES = {
+        '.tar': 'w',
+        '.tar.gz': 'w:gz', '.tgz': 'w:gz',
+        '.tar.bz2': 'w:bz2', '.tbz2': 'w:bz2',
+        '.tar.xz': 'w:xz', '.txz': 'w:xz',
+    }
+
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        lower = archive_path.lower()
+        if lower.endswith('.zip'):
+            self.zip = zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_DEFLATED)
+            self.tar = None
+        else:
+            mode = next(mode for ext, mode in self.TAR_MODES.items() if lower.endswith(ext))
+            self.zip = None
+            self.tar = tarfile.open(archive_path, mode)
+
+    def write(self, member_name, data):
+        """写入一个成员"""
+        if self.zip is not None:
+            self.zip.writestr(member_name, data)
+        else:
+            info = tarfile.TarInfo(member_name)
+            info.size = len(data)
+            info.mtime = time.time()
+            self.tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+        else:
+            self.tar.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class InputPrefetcher:
+    """输入预读：在I/O线程池中提前读取后续输入，使磁盘/NAS读取与当前图片的缩放编码重叠
+    
+    普通文件读入内存缓冲区，较大的文件改用内存映射；压缩包成员按需读入内存。
+    预读深度根据实测的读取耗时与每张图片的处理耗时自动调整，并受 max_depth 限制。
+    必须按索引递增顺序调用 get()。
+    """
+    def __init__(self, paths, max_depth=8, io_workers=4, mmap_threshold=64 * 1024 * 1024):
+        self.paths = list(paths)
+        self.max_depth = max_depth
+        self.mmap_threshold = mmap_threshold
+        self.depth = min(2, max_depth)
+        self.executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='prefetch')
+        self.futures = {}
+        self.next_index = 0
+        # 读取耗时和处理耗时的指数滑动平均(秒)
+        self.io_latency = None
+        self.process_time = None
+        self.last_return = None
+        self.stats_lock = threading.Lock()
+        # tarfile 不支持多线程并发读取，压缩包成员串行读取
+        self.archive_readers = {}
+        self.archive_lock = threading.Lock()
+
+    def get(self, index):
+        """返回第 index 个输入的数据源(可供 Image.open 使用)，用完后应调用其 close()"""
+        if self.last_return is not None:
+            self.process_time = self._average(self.process_time, time.perf_counter() - self.last_return)
+            self._adjust_depth()
+        
+        self._schedule(index + self.depth)
+        future = self.futures.pop(index, None)
+        if future is None:
+            future = self.executor.submit(self._read, self.paths[index])
+        try:
+            return future.result()
+        finally:
+            self.last_return = time.perf_counter()
+
+    def _schedule(self, last_index):
+        """提交直到 last_index 为止尚未提交的读取任务"""
+        while self.next_index < len(self.paths) and self.next_index <= last_index:
+            self.futures[self.next_index] = self.executor.submit(self._read, self.paths[self.next_index])
+            self.next_index += 1
+
+    def _adjust_depth(self):
+        """预读深度 ≈ 读取耗时 / 处理耗时，保证处理当前图片时下一批读取已在进行"""
+        with self.stats_lock:
+            io_latency = self.io_latency
+        if io_latency is None or not self.process_time:
+            return
+        self.depth = max(1, min(self.max_depth, math.ceil(io_latency / self.process_time) + 1))
+
+    @staticmethod
+    def _average(current, sample, weight=0.3):
+        return sample if current is None else current * (1 - weight) + sample * weight
+
+    def _read(self, path):
+        start = time.perf_counter()
+        archive_path, member_name = ArchiveIO.split_member_path(path)
+        if member_name is not None:
+            with self.archive_lock:
+                source = ArchiveIO.open_source(path, self.archive_readers)
+        else:
+            with open(path, 'rb') as f:
+                file_size = os.fstat(f.fileno()).st_size
+                if file_size >= self.mmap_threshold:
+                    source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    if hasattr(source, 'madvise'):
+                        # 提示内核提前读入页面
+                        source.madvise(mmap.MADV_WILLNEED)
+                else:
+                    source = io.BytesIO(f.read())
+        with self.stats_lock:
+            self.io_latency = self._average(self.io_latency, time.perf_counter() - start)
+        return source
 
+    def close(self):
+        """取消未开始的读取，释放已读取但未使用的缓冲区和打开的压缩包"""
+        for future in self.futures.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        for future in self.futures.values():
+            if not future.cancelled() and future.exception() is None:
+                future.result().close()
+        self.futures.clear()
+        for reader in self.archive_readers.values():
+            reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class ConversionHistoryDB:
@@ -220,6 +866,244 @@ class ConversionHistoryDB:
         self.conn.commit()
         return cursor.rowcount  # 返回被删除的记录数
 
+class ConversionJobQueue:
+    """基于共享SQLite文件的转换任务队列，供多台机器/多个容器协同处理同一批任务
+    
+    协调端通过 enqueue() 添加任务；任意数量的无界面工作进程通过 claim() 以租约方式
+    原子领取任务，转换完成后调用 complete() 回写结果。租约过期(工作进程崩溃或失联)
+    的任务会被其他工作进程重新领取，超过最大尝试次数后标记为失败。
+    
+    注意：多台机器共享时，数据库所在的文件系统必须支持可靠的文件锁。
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, db_path='conversion_history.db', timeout=30.0):
+        # isolation_level=None 以便显式使用 BEGIN IMMEDIATE 获取写锁
+        self.conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None)
+        self.create_table()
+    
+    def create_table(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS conversion_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_path TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                sizes TEXT NOT NULL,
+                options TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker_id TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created DATETIME DEFAULT CURRENT_TIMESTAMP,
+                finished DATETIME
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_conversion_jobs_status
+            ON conversion_jobs (status, lease_expires)
+        ''')
+    
+    def enqueue(self, source_path, output_path, sizes, options=None):
+        """添加一个任务，返回任务ID
+        
+        Args:
+            options: 转换选项字典，如 {'preserve_aspect': True, 'add_transparency': False}
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO conversion_jobs (source_path, output_path, sizes, options)
+            VALUES (?, ?, ?, ?)
+        ''', (source_path, output_path, ','.join(map(str, sizes)), json.dumps(options or {})))
+        return cursor.lastrowid
+    
+    def enqueue_many(self, jobs):
+        """在一个事务中批量添加任务，jobs 为 (source_path, output_path, sizes, options) 序列"""
+        cursor = self.conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.executemany('''
+                INSERT INTO conversion_jobs (source_path, output_path, sizes, options)
+                VALUES (?, ?, ?, ?)
+            ''', [(source_path, output_path, ','.join(map(str, sizes)), json.dumps(options or {}))
+                  for source_path, output_path, sizes, options in jobs])
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+    
+    def claim(self, worker_id, lease_seconds=300, max_attempts=3):
+        """原子领取一个待处理或租约已过期的任务
+        
+        Returns:
+            (job_id, source_path, output_path, sizes, options)，没有可领取的任务时返回 None
+        """
+        now = time.time()
+        cursor = self.conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            # 租约过期且已用完尝试次数的任务不再重试
+            cursor.execute('''
+                UPDATE conversion_jobs
+                SET status = ?, error = '租约过期次数超过上限', finished = CURRENT_TIMESTAMP
+                WHERE status = ? AND lease_expires < ? AND attempts >= ?
+            ''', (self.FAILED, self.RUNNING, now, max_attempts))
+            cursor.execute('''
+                SELECT id, source_path, output_path, sizes, options
+                FROM conversion_jobs
+                WHERE status = ? OR (status = ? AND lease_expires < ?)
+                ORDER BY id
+                LIMIT 1
+            ''', (self.PENDING, self.RUNNING, now))
+            row = cursor.fetchone()
+            if row is not None:
+                cursor.execute('''
+                    UPDATE conversion_jobs
+                    SET status = ?, worker_id = ?, lease_expires = ?, attempts = attempts + 1
+                    WHERE id = ?
+                ''', (self.RUNNING, worker_id, now + lease_seconds, row[0]))
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        
+        if row is None:
+            return None
+        job_id, source_path, output_path, sizes, options = row
+        return job_id, source_path, output_path, [int(size) for size in sizes.split(',')], json.loads(options)
+    
+    def renew_lease(self, job_id, worker_id, lease_seconds=300):
+        """延长租约，返回是否仍持有该任务"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            UPDATE conversion_jobs SET lease_expires = ?
+            WHERE id = ? AND worker_id = ? AND status = ?
+        ''', (time.time() + lease_seconds, job_id, worker_id, self.RUNNING))
+        return cursor.rowcount == 1
+    
+    def complete(self, job_id, worker_id, success, error=None):
+        """回写任务结果，成功时同时写入转换历史
+        
+        租约已被其他工作进程接管时不回写，返回 False。
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.execute('''
+                UPDATE conversion_jobs
+                SET status = ?, error = ?, lease_expires = NULL, finished = CURRENT_TIMESTAMP
+                WHERE id = ? AND worker_id = ? AND status = ?
+            ''', (self.DONE if success else self.FAILED, error, job_id, worker_id, self.RUNNING))
+            updated = cursor.rowcount == 1
+            if updated and success:
+                cursor.execute('''
+                    INSERT INTO conversion_history (source_path, output_path, sizes)
+                    SELECT source_path, output_path, sizes FROM conversion_jobs WHERE id = ?
+                ''', (job_id,))
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        return updated
+    
+    def get_counts(self):
+        """按状态统计任务数量"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT status, COUNT(*) FROM conversion_jobs GROUP BY status')
+        counts = {self.PENDING: 0, self.RUNNING: 0, self.DONE: 0, self.FAILED: 0}
+        counts.update(cursor.fetchall())
+        return counts
+    
+    def close(self):
+        self.conn.close()
+
+
+class LeaseHeartbeat(threading.Thread):
+    """转换期间在后台定期延长任务租约，避免耗时较长的任务被其他工作进程接管"""
+    def __init__(self, db_path, job_id, worker_id, lease_seconds):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+
+    def run(self):
+        # SQLite连接不能跨线程使用，心跳线程使用独立的连接
+        queue = ConversionJobQueue(self.db_path)
+        try:
+            while not self.stopped.wait(self.lease_seconds / 3):
+                try:
+                    if not queue.renew_lease(self.job_id, self.worker_id, self.lease_seconds):
+                        # 租约已被其他工作进程接管，complete() 不会回写本进程的结果
+                        break
+                except sqlite3.OperationalError as e:
+                    # 数据库暂时被锁定，下一次心跳再试
+                    print(f"续租失败: {str(e)}")
+        finally:
+            queue.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job_worker(db_path, worker_id=None, lease_seconds=300, poll_interval=1.0, exit_when_empty=True):
+    """无界面工作进程：循环领取任务并执行 convert_to_ico，返回成功处理的任务数
+    
+    Args:
+        worker_id: 工作进程标识，默认为 "主机名:进程号"
+        exit_when_empty: 队列中没有待处理任务时退出；否则按 poll_interval 轮询
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    # 确保历史表存在，complete() 会写入转换历史
+    ConversionHistoryDB(db_path).close()
+    queue = ConversionJobQueue(db_path)
+    success_count = 0
+    try:
+        while True:
+            job = queue.claim(worker_id, lease_seconds)
+            if job is None:
+                counts = queue.get_counts()
+                if exit_when_empty and counts[ConversionJobQueue.PENDING] == 0 \
+                        and counts[ConversionJobQueue.RUNNING] == 0:
+                    break
+                # 其他工作进程的任务仍在运行，等待其完成或租约过期
+                time.sleep(poll_interval)
+                continue
+            
+            job_id, source_path, output_path, sizes, options = job
+            error = None
+            heartbeat = LeaseHeartbeat(db_path, job_id, worker_id, lease_seconds)
+            heartbeat.start()
+            try:
+                output_dir = os.path.dirname(output_path)
+                if output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
+                result = ImageToIconConverter.convert_to_ico(
+                    ArchiveIO.open_source(source_path), output_path, sizes,
+                    options.get('preserve_aspect', True), options.get('add_transparency', False)
+                )
+                if not result:
+                    error = "转换失败"
+            except Exception as e:
+                result = False
+                error = f"转换错误: {str(e)}"
+            finally:
+                heartbeat.stop()
+            
+            if queue.complete(job_id, worker_id, result, error) and result:
+                success_count += 1
+    finally:
+        queue.close()
+        ArchiveIO.close_cached_readers()
+    return success_count
+
+
 class ConversionThread(QThread):
     progress_updated = pyqtSignal(int, str)
     conversion_finished = pyqtSignal(bool, str)
@@ -234,57 +1118,173 @@ class ConversionThread(QThread):
         self.preserve_aspect = True
         self.add_transparency = False
         self.is_batch = False
+        self.use_processes = False
+        self.archive_writer = None
+        self.member_names = None
 
-    def set_params(self, input_paths, output_dir, sizes, preserve_aspect, add_transparency, is_batch):
+    def set_params(self, input_paths, output_dir, sizes, preserve_aspect, add_transparency, is_batch,
+                   use_processes=False):
         self.input_paths = input_paths
         self.output_dir = output_dir
         self.sizes = sizes
         self.preserve_aspect = preserve_aspect
         self.add_transparency = add_transparency
         self.is_batch = is_batch
+        self.use_processes = use_processes
 
     def run(self):
         success_count = 0
         total = len(self.input_paths)
         
-        for i, input_path in enumerate(self.input_paths):
-            try:
-                # 更新进度
-                self.progress_updated.emit(i+1, os.path.basename(input_path))
-                
-                # 确定输出路径
-                if self.is_batch:
-                    filename = os.path.splitext(os.path.basename(input_path))[0] + '.ico'
-                    output_path = os.path.join(self.output_dir, filename)
-                else:
-                    if len(self.input_paths) == 1:
-                        output_path = self.output_dir  # 单文件时output_dir就是完整路径
-                    else:
-                        filename = os.path.splitext(os.path.basename(input_path))[0] + '.ico'
-                        output_path = os.path.join(self.output_dir, filename)
-                
-                # 执行转换
-                result = ImageToIconConverter.convert_to_ico(
-                    input_path, output_path, self.sizes, 
-                    self.preserve_aspect, self.add_transparency
-                )
-                
-                if result:
-                    success_count += 1
-                    if not self.is_batch:
-                        self.conversion_finished.emit(True, output_path)
-                else:
-                    if not self.is_batch:
-                        self.conversion_finished.emit(False, "转换失败")
-                
-            except Exception as e:
-                print(f"转换错误: {str(e)}")
-                if not self.is_batch:
-                    self.conversion_finished.emit(False, f"转换错误: {str(e)}")
+        self.archive_writer = None
+        try:
+            # 批量输出到压缩包时，ICO数据直接写入压缩包，不落地临时文件
+            # 多个输入使用互不重复的相对路径作为输出名，避免同名文件互相覆盖
+            self.member_names = ArchiveIO.output_member_names(self.input_paths)
+            if self.is_batch and ArchiveIO.is_archive(self.output_dir):
+                self.archive_writer = ArchiveWriter(self.output_dir)
+            
+            if self.use_processes and total > 1:
+                success_count = self.run_in_processes()
+            else:
+                success_count = self.run_serial()
+        except Exception as e:
+            # 无法创建输出压缩包等，整批失败；仍需发出完成信号以恢复界面
+            print(f"转换错误: {str(e)}")
+            success_count = 0
+        finally:
+            if self.archive_writer is not None:
+                try:
+                    self.archive_writer.close()
+                except Exception as e:
+                    # 压缩包未能完整写出，其中的结果均不可用
+                    print(f"转换错误: {str(e)}")
+                    success_count = 0
+                self.archive_writer = None
         
         if self.is_batch:
             self.batch_finished.emit(success_count, total)
 
+    def run_serial(self):
+        """在当前线程中逐个转换，返回成功数"""
+        success_count = 0
+        # 在I/O线程中预读后续输入，与当前图片的处理重叠
+        with InputPrefetcher(self.input_paths) as prefetcher:
+            for i, input_path in enumerate(self.input_paths):
+                try:
+                    # 更新进度
+                    self.progress_updated.emit(i+1, os.path.basename(input_path))
+                    
+                    output_path = self.output_target(i)
+                    
+                    # 执行转换(从预读的内存缓冲区解码)
+                    source = prefetcher.get(i)
+                    try:
+                        result = ImageToIconConverter.convert_to_ico(
+                            source, output_path, self.sizes, 
+                            self.preserve_aspect, self.add_transparency
+                        )
+                    finally:
+                        source.close()
+                    
+                    if self.finish_one(i, output_path, result):
+                        success_count += 1
+                    
+                except Exception as e:
+                    print(f"转换错误: {str(e)}")
+                    if not self.is_batch:
+                        self.conversion_finished.emit(False, f"转换错误: {str(e)}")
+        return success_count
+
+    def run_in_processes(self, workers=None):
+        """多进程转换，返回成功数
+        
+        工作进程负责解码和缩放，缩放后的帧经共享内存(SharedFrame)交给当前线程编码为ICO。
+        同时保持多个文件在途，当前线程编码已完成的文件时，工作进程继续处理后续文件。
+        """
+        workers = workers or os.cpu_count() or 1
+        max_in_flight = workers * 2
+        total = len(self.input_paths)
+        success_count = 0
+        completed = 0
+        next_index = 0
+        pending = {}  # future -> (索引, 共享内存帧)
+        
+        # 在带有Qt线程的进程中fork不安全，各平台统一使用spawn启动工作进程
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            try:
+                while next_index < total or pending:
+                    while next_index < total and len(pending) < max_in_flight:
+                        frames = [SharedFrame.allocate('RGBA', (size, size)) for size in self.sizes]
+                        try:
+                            future = executor.submit(
+                                convert_frames_into_shared, self.input_paths[next_index], self.sizes,
+                                self.preserve_aspect, self.add_transparency,
+                                [frame.descriptor for frame in frames]
+                            )
+                        except Exception:
+                            for frame in frames:
+                                frame.close()
+                            raise
+                        pending[future] = (next_index, frames)
+                        next_index += 1
+                    
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i, frames = pending.pop(future)
+                        completed += 1
+                        try:
+                            self.progress_updated.emit(completed, os.path.basename(self.input_paths[i]))
+                            output_path = self.output_target(i)
+                            ico_images = []
+                            for frame, item in zip(frames, future.result()):
+                                if isinstance(item, IcoFrame):
+                                    ico_images.append(item)
+                                elif item == 'RGBA':
+                                    ico_images.append(frame.image())
+                                else:
+                                    ico_images.append(frame.image().convert(item))
+                            result = ImageToIconConverter.encode_ico(ico_images, output_path, self.sizes)
+                            ico_images = None  # 释放对共享内存的引用
+                            if self.finish_one(i, output_path, result):
+                                success_count += 1
+                        except Exception as e:
+                            print(f"转换错误: {str(e)}")
+                            if not self.is_batch:
+                                self.conversion_finished.emit(False, f"转换错误: {str(e)}")
+                        finally:
+                            for frame in frames:
+                                frame.close()
+            finally:
+                # 异常退出时取消尚未开始的任务并回收其共享内存
+                for future, (_, frames) in pending.items():
+                    future.cancel()
+                    for frame in frames:
+                        frame.close()
+        return success_count
+
+    def output_target(self, i):
+        """第 i 个输入的输出位置(路径，或输出到压缩包时的内存缓冲区)"""
+        if self.archive_writer is not None:
+            return io.BytesIO()
+        if not self.is_batch and len(self.input_paths) == 1:
+            return self.output_dir  # 单文件时output_dir就是完整路径
+        output_path = os.path.join(self.output_dir, *self.member_names[i].split('/'))
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        return output_path
+
+    def finish_one(self, i, output_path, result):
+        """处理第 i 个输入的转换结果，返回是否成功"""
+        if result:
+            if self.archive_writer is not None:
+                self.archive_writer.write(self.member_names[i], output_path.getvalue())
+            if not self.is_batch:
+                self.conversion_finished.emit(True, output_path)
+        else:
+            if not self.is_batch:
+                self.conversion_finished.emit(False, "转换失败")
+        return bool(result)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -359,6 +1359,11 @@ class MainWindow(QMainWindow):
         self.lbl_output_path.setWordWrap(True)
         output_layout.addWidget(self.lbl_output_path)
         
+        # 批量输出到压缩包
+        self.cb_output_archive = QCheckBox("批量输出到压缩包(zip/tar)")
+        self.cb_output_archive.setChecked(False)
+        output_layout.addWidget(self.cb_output_archive)
+        
         # 左侧面板内容 - 转换选项
         options_group = QGroupBox("转换选项")
         options_layout = QVBoxLayout()
@@ -394,6 +1399,10 @@ class MainWindow(QMainWindow):
         self.cb_add_transparency.setChecked(False)
         options_layout.addWidget(self.cb_add_transparency)
         
+        self.cb_use_processes = QCheckBox("多进程转换(批量大图更快)")
+        self.cb_use_processes.setChecked(False)
+        options_layout.addWidget(self.cb_use_processes)
+        
         # 右侧面板内容 - 预览和历史记录
         preview_group = QGroupBox("预览")
         preview_layout = QVBoxLayout()
@@ -488,12 +1497,23 @@ class MainWindow(QMainWindow):
     def select_files(self):
         files, _ = QFileDialog.getOpenFileNames(
             self, "选择图片文件", "",
-            "图片文件 (*.png *.jpg *.jpeg *.bmp *.gif);;所有文件 (*.*)"
+            f"图片文件 (*.png *.jpg *.jpeg *.bmp *.gif);;图标文件 (*.ico *.icns);;{ArchiveIO.ARCHIVE_FILTER};;所有文件 (*.*)"
         )
         
         if files:
+            # 压缩包展开为其中的图片成员(仅读取目录，不解压)
+            image_files = []
+            for file in files:
+                if ArchiveIO.is_archive(file):
+                    try:
+                        image_files.extend(ArchiveIO.list_image_members(file))
+                    except Exception as e:
+                        QMessageBox.warning(self, "错误", f"无法读取压缩包: {file}\n{str(e)}")
+                else:
+                    image_files.append(file)
+            
             self.file_list.clear()
-            self.file_list.addItems(files)
+            self.file_list.addItems(image_files)
             self.update_preview()
     
     def select_folder(self):
@@ -503,7 +1523,7 @@ class MainWindow(QMainWindow):
             image_files = []
             for root, dirs, files in os.walk(folder):
                 for file in files:
-                    if file.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
+                    if file.lower().endswith(ArchiveIO.IMAGE_EXTENSIONS):
                         image_files.append(os.path.join(root, file))
             
             if image_files:
@@ -519,7 +1539,15 @@ class MainWindow(QMainWindow):
         self.file_info_label.setText("未选择图片")
     
     def select_output(self):
-        if self.file_list.count() > 1:
+        if self.cb_output_archive.isChecked():
+            # 输出到压缩包，选择压缩包保存路径
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, "保存到压缩包", "icons.zip",
+                f"{ArchiveIO.ARCHIVE_FILTER};;所有文件 (*.*)"
+            )
+            if file_path:
+                self.lbl_output_path.setText(file_path)
+        elif self.file_list.count() > 1:
             # 批量处理，选择文件夹
             folder = QFileDialog.getExistingDirectory(self, "选择输出文件夹")
             if folder:
@@ -559,7 +1587,7 @@ class MainWindow(QMainWindow):
         
         try:
             # 加载图片并显示预览
-            img = Image.open(file_path)
+            img = Image.open(ArchiveIO.open_source(file_path))
             
             # 转换为QPixmap显示
             img.thumbnail((256, 256))
@@ -606,10 +1634,11 @@ class MainWindow(QMainWindow):
         
         # 准备转换参数
         input_paths = [self.file_list.item(i).text() for i in range(self.file_list.count())]
-        is_batch = len(input_paths) > 1 or os.path.isdir(output_path)
+        output_to_archive = ArchiveIO.is_archive(output_path)
+        is_batch = len(input_paths) > 1 or os.path.isdir(output_path) or output_to_archive
         
         # 如果是批量处理但输出是单个文件，调整输出路径为目录
-        if len(input_paths) > 1 and not os.path.isdir(output_path):
+        if len(input_paths) > 1 and not os.path.isdir(output_path) and not output_to_archive:
             output_dir = os.path.dirname(output_path)
             if not output_dir:
                 output_dir = os.path.dirname(input_paths[0])
@@ -627,7 +1656,8 @@ class MainWindow(QMainWindow):
             sizes=selected_sizes,
             preserve_aspect=self.cb_preserve_aspect.isChecked(),
             add_transparency=self.cb_add_transparency.isChecked(),
-            is_batch=is_batch
+            is_batch=is_batch,
+            use_processes=self.cb_use_processes.isChecked()
         )
         
         # 连接信号
@@ -674,10 +1704,10 @@ class MainWindow(QMainWindow):
         # 添加到历史记录
         output_dir = self.lbl_output_path.text()
         sizes = self.get_selected_sizes()
-        for i in range(self.file_list.count()):
-            input_path = self.file_list.item(i).text()
-            filename = os.path.splitext(os.path.basename(input_path))[0] + '.ico'
-            output_path = os.path.join(output_dir, filename)
+        input_paths = [self.file_list.item(i).text() for i in range(self.file_list.count())]
+        # 与 ConversionThread 写入时使用相同的输出路径
+        output_paths = ArchiveIO.batch_output_paths(output_dir, input_paths)
+        for input_path, output_path in zip(input_paths, output_paths):
             self.db.add_record(input_path, output_path, sizes)
         
         self.load_history()
@@ -696,6 +1726,7 @@ class MainWindow(QMainWindow):
         self.btn_select_folder.setEnabled(enabled)
         self.btn_clear_selection.setEnabled(enabled)
         self.btn_select_output.setEnabled(enabled)
+        self.cb_output_archive.setEnabled(enabled)
         self.btn_convert.setEnabled(enabled)
         
         for check in self.size_checks.values():
@@ -703,6 +1734,7 @@ class MainWindow(QMainWindow):
         
         self.cb_preserve_aspect.setEnabled(enabled)
         self.cb_add_transparency.setEnabled(enabled)
+        self.cb_use_processes.setEnabled(enabled)
     
     def load_history(self):
         self.history_list.clear()
@@ -733,7 +1765,8 @@ class MainWindow(QMainWindow):
         
         reply = msg.exec_()
         if reply == QMessageBox.Yes:
-            # 打开文件所在文件夹
+            # 打开文件所在文件夹(压缩包成员则打开压缩包所在文件夹)
+            output_path, _ = ArchiveIO.split_member_path(output_path)
             if sys.platform == "win32":
                 os.startfile(os.path.dirname(output_path))
             elif sys.platform == "darwin":
@@ -745,9 +1778,90 @@ class MainWindow(QMainWindow):
         if self.conversion_thread and self.conversion_thread.isRunning():
             self.conversion_thread.terminate()
         self.db.close()
+        ArchiveIO.close_cached_readers()
         event.accept()
 
+def run_job_cli(argv):
+    """命令行入口：--enqueue 添加任务(协调端)，--worker 启动无界面工作进程"""
+    import argparse
+    parser = argparse.ArgumentParser(description=f"{ProjectInfo.NAME} - 共享任务队列模式")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--enqueue', metavar='DB', help="向共享数据库添加任务")
+    mode.add_argument('--worker', metavar='DB', help="从共享数据库领取并执行任务")
+    parser.add_argument('inputs', nargs='*', help="图片文件、文件夹或压缩包(--enqueue)")
+    parser.add_argument('--output', help="输出文件夹(--enqueue)")
+    parser.add_argument('--sizes', default='256', help="图标尺寸，逗号分隔，默认 256")
+    parser.add_argument('--no-preserve-aspect', action='store_true', help="不保持宽高比")
+    parser.add_argument('--add-transparency', action='store_true', help="强制添加透明通道")
+    parser.add_argument('--worker-id', help="工作进程标识，默认为 主机名:进程号")
+    parser.add_argument('--lease', type=float, default=300, help="任务租约秒数，默认 300")
+    parser.add_argument('--wait', action='store_true', help="队列为空时继续等待新任务")
+    args = parser.parse_args(argv)
+    
+    if args.worker:
+        success_count = run_job_worker(
+            args.worker, args.worker_id, args.lease, exit_when_empty=not args.wait
+        )
+        print(f"工作进程完成 {success_count} 个任务")
+        return 0
+    
+    if not args.output or not args.inputs:
+        parser.error("--enqueue 需要指定 --output 和输入文件")
+    try:
+        sizes = [int(size) for size in args.sizes.split(',')]
+    except ValueError:
+        parser.error(f"--sizes 必须是逗号分隔的整数: {args.sizes}")
+    if not all(1 <= size <= 256 for size in sizes):
+        parser.error(f"--sizes 中的尺寸必须在 1 到 256 之间: {args.sizes}")
+    
+    # 展开文件夹和压缩包，与界面中的选择逻辑一致
+    image_files = []
+    for path in args.inputs:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                for file in files:
+                    if file.lower().endswith(ArchiveIO.IMAGE_EXTENSIONS):
+                        image_files.append(os.path.join(root, file))
+        elif ArchiveIO.is_archive(path):
+            image_files.extend(ArchiveIO.list_image_members(path))
+        else:
+            image_files.append(path)
+    
+    # 工作进程可能在其他目录或其他机器上运行，任务中只保存绝对路径
+    for i, path in enumerate(image_files):
+        archive_path, member_name = ArchiveIO.split_member_path(path)
+        if member_name is None:
+            image_files[i] = os.path.abspath(path)
+        else:
+            image_files[i] = ArchiveIO.join_member_path(os.path.abspath(archive_path), member_name)
+    output_dir = os.path.abspath(args.output)
+    
+    options = {
+        'preserve_aspect': not args.no_preserve_aspect,
+        'add_transparency': args.add_transparency,
+    }
+    # 与界面批量转换相同的输出命名，同名输入不会互相覆盖
+    output_names = ArchiveIO.output_member_names(image_files)
+    queue = ConversionJobQueue(args.enqueue)
+    try:
+        queue.enqueue_many([
+            (path, os.path.join(output_dir, *name.split('/')), sizes, options)
+            for path, name in zip(image_files, output_names)
+        ])
+    finally:
+        queue.close()
+    print(f"已添加 {len(image_files)} 个任务")
+    return 0
+
+
 if __name__ == "__main__":
+    # 打包为可执行文件后，多进程转换的工作进程需要此调用
+    multiprocessing.freeze_support()
+    
+    # 共享任务队列模式不需要图形界面
+    if any(arg in ('--enqueue', '--worker') for arg in sys.argv[1:]):
+        sys.exit(run_job_cli(sys.argv[1:]))
+    
     app = QApplication(sys.argv)
     
     # 设置高DPI支持
@@ -0,0 +1,114 @@
+"""压缩包输入与输出测试：从 zip/tar.gz 流式读取成员，批量转换后写入 zip/tar"""
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import Image_To_Icon_Converter as converter  # noqa: E402
+
+ArchiveIO = converter.ArchiveIO
+
+# (成员名, 颜色)，包含同名成员、仅大小写不同的成员和 ".." 路径段
+ZIP_MEMBERS = [
+    ('a/icon.png', (255, 0, 0)),
+    ('icon.png', (0, 255, 0)),
+    ('../icon.png', (0, 0, 255)),
+    ('sub/./x.png', (255, 255, 0)),
+]
+TAR_MEMBERS = [
+    ('a/icon.png', (0, 255, 255)),
+    ('A/Icon.png', (255, 0, 255)),
+    ('../../evil.png', (128, 128, 128)),
+]
+EXPECTED_NAMES = [
+    'a/icon.ico', 'icon.ico', 'icon (2).ico', 'sub/x.ico',
+    'a/icon (2).ico', 'A/Icon (3).ico', 'evil.ico',
+]
+
+
+def png_data(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 30), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class ArchiveIOTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(ArchiveIO.close_cached_readers)
+
+        self.zip_path = os.path.join(self.temp_dir.name, 'in.zip')
+        with zipfile.ZipFile(self.zip_path, 'w') as archive:
+            for name, color in ZIP_MEMBERS:
+                archive.writestr(name, png_data(color))
+        self.tar_path = os.path.join(self.temp_dir.name, 'in.tar.gz')
+        with tarfile.open(self.tar_path, 'w:gz') as archive:
+            for name, color in TAR_MEMBERS:
+                data = png_data(color)
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+        self.input_paths = ArchiveIO.list_image_members(self.zip_path) + ArchiveIO.list_image_members(self.tar_path)
+        self.colors = [color for _, color in ZIP_MEMBERS + TAR_MEMBERS]
+
+    def test_member_paths_round_trip(self):
+        self.assertEqual(len(self.input_paths), 7)
+        for path, (name, _) in zip(self.input_paths, ZIP_MEMBERS + TAR_MEMBERS):
+            archive_path, member_name = ArchiveIO.split_member_path(path)
+            self.assertIn(archive_path, (self.zip_path, self.tar_path))
+            self.assertEqual(member_name, name)
+        self.assertEqual(ArchiveIO.split_member_path('Dir/In.TGZ!/x/y.png'), ('Dir/In.TGZ', 'x/y.png'))
+        self.assertEqual(ArchiveIO.split_member_path('plain.png'), ('plain.png', None))
+
+    def test_output_member_names_are_unique_and_relative(self):
+        self.assertEqual(ArchiveIO.output_member_names(self.input_paths), EXPECTED_NAMES)
+
+    def test_reader_reads_members_in_any_order(self):
+        with converter.ArchiveReader(self.tar_path) as reader:
+            self.assertEqual(reader.image_names(), [name for name, _ in TAR_MEMBERS])
+            for name, color in reversed(TAR_MEMBERS):
+                with Image.open(io.BytesIO(reader.read(name))) as img:
+                    self.assertEqual(img.getpixel((0, 0)), color)
+
+    def test_batch_streams_members_into_archive_output(self):
+        for extension in ('.zip', '.tar'):
+            with self.subTest(extension=extension):
+                output_path = os.path.join(self.temp_dir.name, 'out' + extension)
+                finished = []
+                thread = converter.ConversionThread()
+                thread.batch_finished.connect(lambda success, total: finished.append((success, total)))
+                thread.set_params(self.input_paths, output_path, [16, 32], True, False, True)
+                thread.run()
+                self.assertEqual(finished, [(7, 7)])
+
+                with converter.ArchiveReader(output_path) as reader:
+                    self.assertEqual(reader.image_names(), EXPECTED_NAMES)
+                    for name, color in zip(EXPECTED_NAMES, self.colors):
+                        with Image.open(io.BytesIO(reader.read(name))) as ico:
+                            self.assertEqual(ico.info['sizes'], {(16, 16), (32, 32)})
+                            self.assertEqual(ico.convert('RGB').getpixel((8, 8)), color)
+
+    def test_writer_streams_members(self):
+        for extension in ('.zip', '.tar', '.tar.gz'):
+            with self.subTest(extension=extension):
+                output_path = os.path.join(self.temp_dir.name, 'stream' + extension)
+                with converter.ArchiveWriter(output_path) as writer:
+                    for name in EXPECTED_NAMES:
+                        writer.write(name, name.encode('utf-8'))
+                with converter.ArchiveReader(output_path) as reader:
+                    self.assertEqual([reader.read(name) for name in EXPECTED_NAMES],
+                                     [name.encode('utf-8') for name in EXPECTED_NAMES])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""多分辨率图标(ICO/ICNS)源文件的解析、帧选择与ICO写入测试"""
+import io
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import IcnsImagePlugin, IcoImagePlugin, Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import Image_To_Icon_Converter as converter  # noqa: E402
+
+Converter = converter.ImageToIconConverter
+
+
+def png_data(size, color):
+    buffer = io.BytesIO()
+    Image.new('RGBA', (size, size), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def bmp_data(size, color):
+    """ICO中的BMP帧：去掉文件头的DIB，高度包含AND掩码(为图像高度的两倍)"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (size, size), color).save(buffer, format='BMP')
+    dib = bytearray(buffer.getvalue()[14:])
+    struct.pack_into('<i', dib, 8, size * 2)
+    row_bytes = (size + 31) // 32 * 4
+    return bytes(dib) + b'\x00' * (row_bytes * size)
+
+
+def make_ico(entries):
+    """按 [(目录宽, 目录高, 位深, 帧数据)] 手工组装ICO，宽高直接写入目录字节"""
+    header = struct.pack('<HHH', 0, 1, len(entries))
+    directory = b''
+    offset = len(header) + 16 * len(entries)
+    for width, height, bpp, data in entries:
+        directory += struct.pack('<BBBBHHII', width, height, 0, 0, 1, bpp, len(data), offset)
+        offset += len(data)
+    return header + directory + b''.join(entry[3] for entry in entries)
+
+
+class IconFramesTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def write_source(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def output_frames(self, output_path):
+        with open(output_path, 'rb') as fp:
+            return {frame.size: frame for frame in Converter.read_ico_entries(fp)}
+
+    def test_exact_size_png_and_bmp_frames_are_copied_raw(self):
+        png_frame = png_data(32, (255, 0, 0, 128))
+        bmp_frame = bmp_data(16, (0, 0, 255))
+        source = self.write_source('src.ico', make_ico([(16, 16, 32, bmp_frame), (32, 32, 32, png_frame)]))
+        output_path = os.path.join(self.temp_dir.name, 'out.ico')
+
+        self.assertTrue(Converter.convert_to_ico(source, output_path, [16, 32]))
+        frames = self.output_frames(output_path)
+        self.assertEqual(set(frames), {(16, 16), (32, 32)})
+        self.assertEqual(frames[(32, 32)].data, png_frame)
+        self.assertEqual(frames[(16, 16)].data, bmp_frame)
+
+    def test_oversized_png_frame_with_zero_directory_entry_is_resized(self):
+        # 512px 的PNG帧在目录中记为 0(即256)，不能原样作为256帧复制
+        large_frame = png_data(512, (0, 255, 0, 255))
+        source = self.write_source('src.ico', make_ico([(0, 0, 32, large_frame)]))
+        with open(source, 'rb') as fp:
+            self.assertEqual(Converter.read_ico_frames(fp), {})
+
+        output_path = os.path.join(self.temp_dir.name, 'out.ico')
+        self.assertTrue(Converter.convert_to_ico(source, output_path, [32, 256]))
+        frames = self.output_frames(output_path)
+        self.assertEqual(set(frames), {(32, 32), (256, 256)})
+        self.assertNotEqual(frames[(256, 256)].data, large_frame)
+        self.assertEqual(Converter.ico_frame_dimensions(frames[(256, 256)].data), (256, 256))
+
+    def test_ico_decodes_nearest_larger_frame(self):
+        source = self.write_source('src.ico', make_ico([
+            (16, 16, 32, png_data(16, 'red')),
+            (64, 64, 32, png_data(64, 'green')),
+            (0, 0, 32, png_data(256, 'blue')),
+        ]))
+        decoded = []
+        getimage = IcoImagePlugin.IcoFile.getimage
+
+        def spy(ico, size, *args):
+            decoded.append(size)
+            return getimage(ico, size, *args)
+
+        with mock.patch.object(IcoImagePlugin.IcoFile, 'getimage', spy):
+            frames = Converter.retarget_frames(source, [48, 100, 300])
+        # 48 取 64 帧，100 取 256 帧，300 没有更大的帧时取最大帧；每帧只解码一次
+        self.assertEqual(decoded, [(64, 64), (256, 256)])
+        self.assertEqual([frame.size for frame in frames], [(48, 48), (100, 100), (300, 300)])
+        self.assertEqual(frames[0].getpixel((24, 24))[:3], (0, 128, 0))
+
+    def test_icns_decodes_nearest_larger_frame(self):
+        buffer = io.BytesIO()
+        Image.new('RGBA', (1024, 1024), (10, 20, 30, 255)).save(buffer, format='ICNS')
+        source = self.write_source('src.icns', buffer.getvalue())
+        decoded = []
+        getimage = IcnsImagePlugin.IcnsFile.getimage
+
+        def spy(icns, size=None):
+            decoded.append(size)
+            return getimage(icns, size)
+
+        with mock.patch.object(IcnsImagePlugin.IcnsFile, 'getimage', spy):
+            frames = Converter.retarget_frames(source, [48, 100])
+        # ICNS 的尺寸为 (宽, 高, 缩放倍数)：48 取 32@2x(64px)，100 取 128@1x
+        self.assertEqual(decoded, [(32, 32, 2), (128, 128, 1)])
+        self.assertEqual([frame.size for frame in frames], [(48, 48), (100, 100)])
+
+    def test_encode_ico_rejects_frame_not_matching_directory(self):
+        output_path = os.path.join(self.temp_dir.name, 'out.ico')
+        frame = converter.IcoFrame(256, 256, 0, 1, 32, png_data(512, 'red'))
+
+        self.assertFalse(Converter.encode_ico([frame], output_path, [256]))
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""共享SQLite任务队列的多进程测试
+
+在同一台机器上启动多个 --worker 进程共享一个数据库文件，模拟多机协同处理。
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'Image_To_Icon_Converter.py')
+sys.path.insert(0, ROOT)
+
+import Image_To_Icon_Converter as converter  # noqa: E402
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.db_path = os.path.join(self.temp_dir.name, 'jobs.db')
+        converter.ConversionHistoryDB(self.db_path).close()
+
+    def make_images(self, count):
+        source_dir = os.path.join(self.temp_dir.name, 'src')
+        os.makedirs(source_dir)
+        for i in range(count):
+            Image.new('RGB', (300, 200), (i * 10 % 256, 80, 160)).save(os.path.join(source_dir, f'img{i}.png'))
+        return source_dir
+
+    def run_cli(self, *args):
+        env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+        return subprocess.Popen([sys.executable, SCRIPT, *args], env=env,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+    def test_several_workers_drain_shared_queue(self):
+        source_dir = self.make_images(24)
+        output_dir = os.path.join(self.temp_dir.name, 'out')
+        enqueue = self.run_cli('--enqueue', self.db_path, '--output', output_dir,
+                               '--sizes', '16,32,256', source_dir)
+        self.assertEqual(enqueue.wait(timeout=60), 0, enqueue.stdout.read())
+
+        workers = [self.run_cli('--worker', self.db_path, '--worker-id', f'w{i}') for i in range(4)]
+        for worker in workers:
+            self.assertEqual(worker.wait(timeout=120), 0, worker.stdout.read())
+
+        conn = sqlite3.connect(self.db_path)
+        self.addCleanup(conn.close)
+        rows = conn.execute('SELECT status, attempts FROM conversion_jobs').fetchall()
+        self.assertEqual(len(rows), 24)
+        # 每个任务恰好由一个工作进程完成一次
+        self.assertEqual(set(rows), {('done', 1)})
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM conversion_history').fetchone()[0], 24)
+
+        self.assertEqual(sorted(os.listdir(output_dir)), sorted(f'img{i}.ico' for i in range(24)))
+        with Image.open(os.path.join(output_dir, 'img0.ico')) as ico:
+            self.assertEqual(ico.info['sizes'], {(16, 16), (32, 32), (256, 256)})
+
+    def test_expired_lease_is_reclaimed(self):
+        source_dir = self.make_images(1)
+        queue = converter.ConversionJobQueue(self.db_path)
+        self.addCleanup(queue.close)
+        output_path = os.path.join(self.temp_dir.name, 'out.ico')
+        job_id = queue.enqueue(os.path.join(source_dir, 'img0.png'), output_path, [16, 32])
+
+        self.assertEqual(queue.claim('dead', lease_seconds=0.2)[0], job_id)
+        self.assertIsNone(queue.claim('other'))
+        time.sleep(0.3)
+
+        self.assertEqual(converter.run_job_worker(self.db_path, 'alive'), 1)
+        # 原工作进程失去租约后不能再回写结果
+        self.assertFalse(queue.complete(job_id, 'dead', False, 'late'))
+        self.assertEqual(queue.get_counts()[converter.ConversionJobQueue.DONE], 1)
+
+    def test_heartbeat_keeps_lease_while_converting(self):
+        queue = converter.ConversionJobQueue(self.db_path)
+        self.addCleanup(queue.close)
+        queue.enqueue('a.png', 'a.ico', [16])
+        job_id = queue.claim('slow', lease_seconds=0.6)[0]
+
+        heartbeat = converter.LeaseHeartbeat(self.db_path, job_id, 'slow', 0.6)
+        heartbeat.start()
+        try:
+            time.sleep(1.5)
+            self.assertIsNone(queue.claim('other', lease_seconds=0.6))
+        finally:
+            heartbeat.stop()
+        self.assertTrue(queue.complete(job_id, 'slow', True))
+
+
+if __name__ == '__main__':
+    unittest.main()